@@ -5,7 +5,6 @@ import logging
 import sys
 import time
 import atexit
-from dataclasses import dataclass
 from multiprocessing.connection import Listener
 from threading import Thread
 import datetime
@@ -21,6 +20,10 @@ from slack_sdk import WebClient
 
 from .config import get_config, check_or_create_config, SOCKET_DESCRIPTOR
 from . import os_interaction_utils
+from .channels import get_channels, for_each_channel
+from . import profiling
+from . import state
+from .state import Status, NextSlackStatus, get_unix_time
 
 client = None
 afk_thread = None
@@ -35,45 +38,42 @@ def compute_message(message):
     return message
 
 
-def get_unix_time(plus_seconds=0):
-    """Get the current unix time.
-
-    Adds plus_seconds to the current time if seconds is not None.
-    """
-    return int(time.time()) + plus_seconds
-
-
-@dataclass
-class Status:
-    im_afk: bool = False
-    going_afk: bool = False
-    last_message_ts: str = None
-    last_activity_ts: int = get_unix_time()
+status = None
+slack_status = None
 
-    def __str__(self) -> str:
-        return (
-            f"Status(im_afk={self.im_afk}, going_afk={self.going_afk} "
-            f"last_message_ts={self.last_message_ts}, "
-            f"last_activity_ts={self.last_activity_ts})"
-        )
 
+def checkpoint():
+    """Save a snapshot of the current runtime state."""
+    state.checkpoint(status, slack_status)
 
-class NextSlackStatus:
-    def __init__(self):
-        self.status_text: str = get_config("status_text")
-        self.status_emoji: str = get_config("status_emoji")
-        self.away_message: str = get_config("away_message")
-        self.back_message: str = get_config("back_message")
 
-    def __str__(self) -> str:
-        return (
-            f"NextSlackStatus(status_text={self.status_text}, status_emoji={self.status_emoji}, "
-            f"away_message={self.away_message}, back_message={self.back_message})"
-        )
+def restore_state():
+    """Rebuild runtime state from the last snapshot (if any)."""
+    global status
+    global slack_status
+    status = Status()
+    slack_status = NextSlackStatus()
+    data = state.load_state()
+    if not data:
+        return
+    status, slack_status = state.restore_snapshot(data)
+    click.echo(f"Restored state: {status}")
+    logger.debug("restored slack status: %s", slack_status)
 
 
-status = None
-slack_status = None
+def resume_pending_afk():
+    """Reschedule an AFK transition that was pending when the agent stopped."""
+    if not status.going_afk or status.im_afk:
+        return
+    delay = state.resume_delay(status)
+    if delay is None:
+        click.echo("Dropping stale pending AFK transition")
+        status.going_afk = False
+        status.afk_due_ts = None
+        checkpoint()
+        return
+    click.echo("Resuming pending AFK transition")
+    handleAFK(delay)
 
 
 def handleBack(afk_delay=None):
@@ -88,9 +88,12 @@ def handleBack(afk_delay=None):
         # Come back before fully going AFK. Do nothing
         click.echo("Back before fully going AFK. Abort")
         status.going_afk = False
+        status.afk_due_ts = None
+        checkpoint()
         return
     status.im_afk = False
     status.going_afk = False
+    status.afk_due_ts = None
     try:
         click.echo("Setting back status")
         client.api_call(
@@ -103,31 +106,41 @@ def handleBack(afk_delay=None):
                 }
             },
         )
-        if get_config("channel") and slack_status.back_message:
+        if slack_status.channels and slack_status.back_message:
+            back_channels = slack_status.channels
             # 1. if you are back in less than "delay_for_reaction_emoji" seconds, use an emoji
             if (
-                status.last_message_ts
+                status.last_messages
                 and status.last_activity_ts + get_config("delay_for_reaction_emoji")
                 > get_unix_time()
             ):
-                click.echo("Reacting to last message")
-                client.reactions_add(
-                    channel=get_config("channel"),
-                    name=get_config("back_emoji"),
-                    timestamp=status.last_message_ts,
+                click.echo("Reacting to last messages")
+                reacted = for_each_channel(
+                    lambda channel: client.reactions_add(
+                        channel=channel,
+                        name=get_config("back_emoji"),
+                        timestamp=status.last_messages[channel],
+                    ),
+                    list(status.last_messages),
                 )
-                return
+                # fallback to a back message where the reaction failed
+                back_channels = [c for c in status.last_messages if c not in reacted]
             # 2. reply with an explicit message
-            click.echo("Sending back message")
-            client.chat_postMessage(
-                channel=get_config("channel"),
-                text=compute_message(slack_status.back_message),
-            )
+            if back_channels:
+                click.echo("Sending back message")
+                for_each_channel(
+                    lambda channel: client.chat_postMessage(
+                        channel=channel,
+                        text=compute_message(slack_status.back_message),
+                    ),
+                    back_channels,
+                )
     except Exception as e:
         click.echo(f"Error: {e}")
     finally:
         # Reset next slack status
         slack_status = NextSlackStatus()
+        checkpoint()
 
 
 def handleAFK(afk_delay=None):
@@ -143,6 +156,8 @@ def handleAFK(afk_delay=None):
 
         # Delay the AFK handling
         delay = get_config("delay_after_screen_lock", 0) if afk_delay is None else afk_delay
+        status.afk_due_ts = get_unix_time(delay)
+        checkpoint()
         click.echo(f"sleeping for {delay}")
         time.sleep(delay)
         if not status.going_afk:
@@ -150,6 +165,7 @@ def handleAFK(afk_delay=None):
             click.echo("Not going AFK anymore. Doing nothing")
             return
         status.im_afk = True
+        status.afk_due_ts = None
         try:
             click.echo("Setting away status")
             client.api_call(
@@ -163,16 +179,21 @@ def handleAFK(afk_delay=None):
                 },
             )
             logger.debug("slack status: %s", slack_status)
-            if get_config("channel") and slack_status.away_message:
+            if slack_status.channels and slack_status.away_message:
                 click.echo("Sending away message")
-                data = client.chat_postMessage(
-                    channel=get_config("channel"),
-                    text=compute_message(slack_status.away_message),
+                results = for_each_channel(
+                    lambda channel: client.chat_postMessage(
+                        channel=channel,
+                        text=compute_message(slack_status.away_message),
+                    ),
+                    slack_status.channels,
                 )
-                status.last_message_ts = data["ts"]
+                status.last_messages = {channel: data["ts"] for channel, data in results.items()}
                 status.last_activity_ts = get_unix_time()
         except Exception as e:
             click.echo(f"Error: {e}")
+        finally:
+            checkpoint()
 
     global afk_thread
     afk_thread = Thread(target=_perform_afk, daemon=True)
@@ -256,6 +277,7 @@ def fill_slack_status(custom_message: dict, action_conf: dict):
     silent = custom_message.get("silent", False)
     slack_status.status_text = _property_getter("status_text", custom_message, action_conf)
     slack_status.status_emoji = _property_getter("status_emoji", custom_message, action_conf)
+    slack_status.channels = get_channels(_property_getter("channel", custom_message, action_conf))
     if not silent:
         slack_status.away_message = _property_getter("away_message", custom_message, action_conf)
     else:
@@ -267,6 +289,7 @@ def fill_slack_status(custom_message: dict, action_conf: dict):
     else:
         slack_status.back_message = None
     logger.debug(f"new slack status: {slack_status}")
+    checkpoint()
 
 
 def execute_command(command):
@@ -282,6 +305,25 @@ def execute_command(command):
             click.echo(f"Unknown command {command}")
 
 
+def execute_profile_command(command):
+    click.echo(f'Profiling: "{command}"')
+    paths = []
+    try:
+        match command:
+            case "start":
+                profiling.start_profiling()
+            case "stop":
+                paths = profiling.stop_profiling()
+            case "dump":
+                paths = profiling.dump_profiling()
+            case _:
+                click.echo(f"Unknown profile command {command}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+    for path in paths:
+        click.echo(f"Profiling data written to {path}")
+
+
 def listen_for_messages():
     try:
         os.unlink(SOCKET_DESCRIPTOR)
@@ -297,6 +339,9 @@ def listen_for_messages():
             conn = listener.accept()
             continue
         click.echo(f"Message: {msg}")
+        if msg["action"] == "profile":
+            execute_profile_command(msg.get("profile_command"))
+            continue
         # check is Slack is running
         if not os_interaction_utils.check_slack_is_active():
             click.echo("Slack client is not active. Doing nothing")
@@ -350,12 +395,9 @@ def main(verbose: bool = False):
     The file will be created the first time you run the agent.
     """
     global client
-    global slack_status
-    global status
     click.echo("AFK agent: starting…")
     check_or_create_config()
-    slack_status = NextSlackStatus()
-    status = Status()
+    restore_state()
     atexit.register(exit_handler)
     if verbose:
         logging.basicConfig(level=logging.DEBUG)
@@ -369,6 +411,7 @@ def main(verbose: bool = False):
     messages_thread.start()
     # 2. wait for system messages
     client = WebClient(token=token)
+    resume_pending_afk()
     AppHelper.runConsoleEventLoop()
 
 
@@ -0,0 +1,34 @@
+"""Channel helpers."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+
+
+def get_channels(channel) -> list[str]:
+    """Normalize the channel setting (a single id, a list of ids or None) to a list."""
+    if not channel:
+        return []
+    if isinstance(channel, str):
+        return [channel]
+    return list(channel)
+
+
+def for_each_channel(action, channels):
+    """Run action(channel) concurrently on all channels.
+
+    Returns results of successful calls, by channel.
+    Failures are reported without stopping calls to other channels.
+    """
+    results = {}
+    if not channels:
+        return results
+    with ThreadPoolExecutor(max_workers=len(channels)) as executor:
+        futures = {executor.submit(action, channel): channel for channel in channels}
+        for future in as_completed(futures):
+            channel = futures[future]
+            try:
+                results[channel] = future.result()
+            except Exception as e:
+                click.echo(f"Error on channel {channel}: {e}")
+    return results
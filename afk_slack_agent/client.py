@@ -7,19 +7,30 @@ from multiprocessing.connection import Client
 import click
 
 from . import config
+from .profiling import PROFILE_COMMANDS
 
 
-def validate_action(action: str):
+def validate_action(action: str, profile_command: str = None):
     if not action:
         click.echo("No action provided. Action is required when running the client.")
         sys.exit(1)
     actions = [a.get("action") for a in config.get_config("actions") if a.get("action")] + [
         "terminate",
         "back",
+        "profile",
     ]
     if action not in actions:
         click.echo(f"Action \"{action}\" is not valid. Valid actions are {', '.join(actions)}")
         sys.exit(1)
+    if action != "profile" and profile_command:
+        click.echo(f"Unexpected extra argument \"{profile_command}\"")
+        sys.exit(1)
+    if action == "profile" and profile_command not in PROFILE_COMMANDS:
+        click.echo(
+            f"Profile command \"{profile_command}\" is not valid. "
+            f"Valid profile commands are {', '.join(PROFILE_COMMANDS)}"
+        )
+        sys.exit(1)
 
 
 @click.command()
@@ -62,6 +73,7 @@ def validate_action(action: str):
     help="Do not execute command configured for this action.",
 )
 @click.argument("action", required=False)
+@click.argument("profile_command", required=False)
 def main(
     verbose: bool = False,
     status: str = "",
@@ -70,17 +82,20 @@ def main(
     action: str = None,
     silent: bool = False,
     no_command: bool = False,
+    profile_command: str = None,
 ):
     """Client for AFK agent integration with Slack™.
 
     This command connects to the afk_agent process, to runs actions on the system.
     Configuring actions is done by editing the .afk.json file in your home directory.
     Action can be overridden by using options.
+
+    Use "profile start|stop|dump" to profile the running agent.
     """
     if verbose:
         logging.basicConfig(level=logging.DEBUG)
     click.echo("AFK client: starting…")
-    validate_action(action)
+    validate_action(action, profile_command)
     try:
         conn = Client(config.SOCKET_DESCRIPTOR, "AF_UNIX")
         click.echo(f"Sending {action}")
@@ -92,6 +107,7 @@ def main(
                 "away_message": away_message,
                 "silent": silent,
                 "no_command": no_command,
+                "profile_command": profile_command,
             }
         )
         conn.close()
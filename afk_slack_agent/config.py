@@ -10,6 +10,8 @@ from pathlib import Path
 config = {}
 home = str(Path.home())
 config_file = os.path.join(home, ".afk.json")
+state_file = os.path.join(home, ".afk_state.json")
+profile_dir = os.path.join(home, ".afk_profiles")
 
 SOCKET_DESCRIPTOR = "/tmp/slack_afk_agent"
 
@@ -0,0 +1,130 @@
+"""On-demand profiling of the running agent.
+
+A sampling profiler periodically collects the stack of every thread (the AppKit event loop, the
+client listener and the AFK workers), while tracemalloc tracks memory allocations.
+Nothing runs while profiling is off.
+
+Stacks are written in the "folded" format (one ``frame;frame;frame count`` line per stack), as
+used by flamegraph.pl and speedscope. Memory snapshots use the tracemalloc dump format, readable by
+``tracemalloc.Snapshot.load``.
+"""
+
+import os
+import sys
+import logging
+import datetime
+import threading
+import tracemalloc
+from collections import Counter
+
+from .config import profile_dir
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COMMANDS = ("start", "stop", "dump")
+
+# seconds between two samples
+SAMPLE_INTERVAL = 0.01
+
+
+class Sampler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="afk-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            samples = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                samples.append(";".join(reversed(stack)))
+            with self._lock:
+                self.stacks.update(samples)
+
+    def dump(self, path: str):
+        with self._lock:
+            stacks = dict(self.stacks)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.items():
+                f.write(f"{stack} {count}\n")
+
+
+sampler = None
+
+
+def _output_path(kind: str, ext: str) -> str:
+    os.makedirs(profile_dir, exist_ok=True)
+    return os.path.join(profile_dir, f"afk_{kind}_{datetime.datetime.now():%Y%m%d-%H%M%S-%f}.{ext}")
+
+
+def start_profiling():
+    """Start sampling threads and tracing memory allocations."""
+    global sampler
+    if sampler is not None:
+        logger.warning("Profiling is already running")
+        return
+    tracemalloc.start()
+    sampler = Sampler()
+    sampler.start()
+
+
+def dump_profiling() -> list[str]:
+    """Write the data collected so far, keeping the profiler running.
+
+    Returns the paths of the written files.
+    """
+    if sampler is None:
+        logger.warning("Profiling is not running")
+        return []
+    stacks_path = _output_path("profile", "folded")
+    sampler.dump(stacks_path)
+    memory_path = _output_path("memory", "tracemalloc")
+    tracemalloc.take_snapshot().dump(memory_path)
+    return [stacks_path, memory_path]
+
+
+def stop_profiling() -> list[str]:
+    """Dump collected data, then stop profiling.
+
+    Returns the paths of the written files.
+    """
+    global sampler
+    if sampler is None:
+        logger.warning("Profiling is not running")
+        return []
+    sampler.stop()
+    try:
+        return dump_profiling()
+    finally:
+        sampler = None
+        tracemalloc.stop()
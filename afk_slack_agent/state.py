@@ -0,0 +1,150 @@
+"""Runtime state, and its snapshots used for restoring the agent after a restart."""
+
+import os
+import json
+import time
+import logging
+import tempfile
+from dataclasses import dataclass, asdict, field, fields
+from threading import RLock
+
+from .config import get_config, state_file
+from .channels import get_channels
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+
+# seconds after its due time a pending AFK transition can still be resumed at startup
+RESUME_GRACE_PERIOD = 5
+
+_lock = RLock()
+
+
+def get_unix_time(plus_seconds=0):
+    """Get the current unix time.
+
+    Adds plus_seconds to the current time if seconds is not None.
+    """
+    return int(time.time()) + plus_seconds
+
+
+@dataclass
+class Status:
+    im_afk: bool = False
+    going_afk: bool = False
+    # last message timestamp, by channel
+    last_messages: dict = field(default_factory=dict)
+    last_activity_ts: int = get_unix_time()
+    # when a pending AFK transition is expected to be applied
+    afk_due_ts: int = None
+
+    def __str__(self) -> str:
+        return (
+            f"Status(im_afk={self.im_afk}, going_afk={self.going_afk} "
+            f"last_messages={self.last_messages}, "
+            f"last_activity_ts={self.last_activity_ts}, "
+            f"afk_due_ts={self.afk_due_ts})"
+        )
+
+
+class NextSlackStatus:
+    def __init__(self):
+        self.status_text: str = get_config("status_text")
+        self.status_emoji: str = get_config("status_emoji")
+        self.away_message: str = get_config("away_message")
+        self.back_message: str = get_config("back_message")
+        self.channels: list[str] = get_channels(get_config("channel"))
+
+    def __str__(self) -> str:
+        return (
+            f"NextSlackStatus(status_text={self.status_text}, status_emoji={self.status_emoji}, "
+            f"away_message={self.away_message}, back_message={self.back_message}, "
+            f"channels={self.channels})"
+        )
+
+
+def save_state(data: dict):
+    """Atomically write a snapshot of the agent runtime state.
+
+    Data is written to a temporary file in the same folder, then moved over the old snapshot,
+    so a crash while writing never leaves a truncated file behind.
+    """
+    with _lock:
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(state_file), prefix=".afk_state.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": STATE_VERSION, **data}, f)
+            os.replace(tmp_path, state_file)
+        except Exception:
+            logger.exception("Cannot write state snapshot %s", state_file)
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+
+
+def load_state() -> dict:
+    """Read the last state snapshot. Returns an empty dict if missing or not usable."""
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot read state snapshot %s: %s", state_file, e)
+        return {}
+    if not isinstance(data, dict):
+        logger.warning("Cannot read state snapshot %s: not an object", state_file)
+        return {}
+    if data.get("version") != STATE_VERSION:
+        logger.warning("Ignoring state snapshot with unknown version %s", data.get("version"))
+        return {}
+    return data
+
+
+def build_snapshot(status: Status, slack_status: NextSlackStatus) -> dict:
+    """Build a snapshot of the runtime state.
+
+    Only values of the next Slack status overridden by a custom action are kept: the other ones
+    are always read from the configuration.
+    """
+    defaults = vars(NextSlackStatus())
+    overrides = {k: v for k, v in vars(slack_status).items() if v != defaults.get(k)}
+    return {"status": asdict(status), "slack_status": overrides}
+
+
+def checkpoint(status: Status, slack_status: NextSlackStatus):
+    """Save a snapshot of the runtime state.
+
+    The snapshot is built and written under the same lock, so concurrent checkpoints
+    are written in the same order they are taken.
+    """
+    with _lock:
+        save_state(build_snapshot(status, slack_status))
+
+
+def restore_snapshot(data: dict) -> tuple[Status, NextSlackStatus]:
+    """Rebuild runtime state from a snapshot. Unknown values are ignored."""
+    status_fields = {f.name for f in fields(Status)}
+    status = Status(**{k: v for k, v in data.get("status", {}).items() if k in status_fields})
+    slack_status = NextSlackStatus()
+    for key, value in data.get("slack_status", {}).items():
+        if hasattr(slack_status, key):
+            setattr(slack_status, key, value)
+    return status, slack_status
+
+
+def resume_delay(status: Status):
+    """Seconds to wait before applying a pending AFK transition.
+
+    Returns None when the transition should have been applied more than RESUME_GRACE_PERIOD
+    seconds ago (user may be back in the meantime), or was never scheduled.
+    """
+    if status.afk_due_ts is None or status.afk_due_ts + RESUME_GRACE_PERIOD < get_unix_time():
+        return None
+    return max(0, status.afk_due_ts - get_unix_time())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+
+"""Tests for `afk_slack_agent.channels` module."""
+
+from afk_slack_agent.channels import get_channels, for_each_channel
+
+
+def test_get_channels():
+    assert get_channels(None) == []
+    assert get_channels("") == []
+    assert get_channels("C1") == ["C1"]
+    assert get_channels(["C1", "C2"]) == ["C1", "C2"]
+
+
+def test_for_each_channel():
+    assert for_each_channel(lambda channel: channel.lower(), ["C1", "C2"]) == {
+        "C1": "c1",
+        "C2": "c2",
+    }
+
+
+def test_for_each_channel_no_channels():
+    assert for_each_channel(lambda channel: channel, []) == {}
+
+
+def test_for_each_channel_partial_failure(capsys):
+    def action(channel):
+        if channel == "C2":
+            raise ValueError("channel_not_found")
+        return {"ts": f"{channel}.1"}
+
+    results = for_each_channel(action, ["C1", "C2", "C3"])
+    assert results == {"C1": {"ts": "C1.1"}, "C3": {"ts": "C3.1"}}
+    assert "Error on channel C2: channel_not_found" in capsys.readouterr().out
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+
+"""Tests for `afk_slack_agent.client` module."""
+
+import pytest
+
+from afk_slack_agent import client
+
+
+@pytest.fixture(autouse=True)
+def actions(monkeypatch):
+    monkeypatch.setattr(
+        client.config, "get_config", lambda key, default=None: [{"action": "lunch"}]
+    )
+
+
+def test_validate_action():
+    client.validate_action("lunch")
+    client.validate_action("back")
+    client.validate_action("profile", "start")
+
+
+@pytest.mark.parametrize(
+    "action,profile_command",
+    [(None, None), ("dinner", None), ("lunch", "typo"), ("profile", None), ("profile", "go")],
+)
+def test_validate_action_invalid(action, profile_command):
+    with pytest.raises(SystemExit):
+        client.validate_action(action, profile_command)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""Tests for `afk_slack_agent.profiling` module."""
+
+import time
+import tracemalloc
+
+import pytest
+
+from afk_slack_agent import profiling
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "profile_dir", str(tmp_path))
+    yield tmp_path
+    if profiling.sampler is not None:
+        profiling.stop_profiling()
+
+
+def check_output(paths):
+    stacks_path, memory_path = paths
+    assert stacks_path.endswith(".folded")
+    with open(stacks_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.split(";")[0]
+        assert int(count) > 0
+    assert memory_path.endswith(".tracemalloc")
+    assert isinstance(tracemalloc.Snapshot.load(memory_path), tracemalloc.Snapshot)
+
+
+def test_profiling(profile_dir):
+    profiling.start_profiling()
+    assert tracemalloc.is_tracing()
+    time.sleep(0.1)
+    check_output(profiling.dump_profiling())
+    assert profiling.sampler.running
+    check_output(profiling.stop_profiling())
+    assert profiling.sampler is None
+    assert not tracemalloc.is_tracing()
+    assert len(list(profile_dir.iterdir())) == 4
+
+
+def test_stop_with_failing_dump(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "profile_dir", str(profile_dir / "not_a_dir" / "profiles"))
+    (profile_dir / "not_a_dir").write_text("not a directory")
+    profiling.start_profiling()
+    with pytest.raises(OSError):
+        profiling.stop_profiling()
+    assert profiling.sampler is None
+    assert not tracemalloc.is_tracing()
+    assert profiling.stop_profiling() == []
+
+
+def test_sampler_stop_twice():
+    sampler = profiling.Sampler()
+    sampler.start()
+    sampler.stop()
+    sampler.stop()
+    assert not sampler.running
+
+
+def test_not_running(profile_dir):
+    assert profiling.dump_profiling() == []
+    assert profiling.stop_profiling() == []
+    assert list(profile_dir.iterdir()) == []
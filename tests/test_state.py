@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+"""Tests for `afk_slack_agent.state` module."""
+
+import os
+import json
+
+import pytest
+
+from afk_slack_agent import state
+
+
+@pytest.fixture
+def state_file(tmp_path, monkeypatch):
+    path = str(tmp_path / ".afk_state.json")
+    monkeypatch.setattr(state, "state_file", path)
+    return path
+
+
+def test_round_trip(state_file):
+    data = {"status": {"im_afk": True, "last_activity_ts": 42}, "slack_status": {}}
+    state.save_state(data)
+    assert state.load_state() == {"version": state.STATE_VERSION, **data}
+    assert os.listdir(os.path.dirname(state_file)) == [".afk_state.json"]
+
+
+def test_missing_file(state_file):
+    assert state.load_state() == {}
+
+
+def test_corrupt_file(state_file):
+    with open(state_file, "w", encoding="utf-8") as f:
+        f.write('{"version": ')
+    assert state.load_state() == {}
+
+
+def test_version_mismatch(state_file):
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump({"version": state.STATE_VERSION + 1, "status": {}}, f)
+    assert state.load_state() == {}
+
+
+def test_write_failure_is_not_raised(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "state_file", str(tmp_path / "missing" / ".afk_state.json"))
+    state.save_state({"status": {}})
+    assert state.load_state() == {}
+
+
+def test_not_an_object(state_file):
+    for payload in ("[]", "1", '"text"', "null"):
+        with open(state_file, "w", encoding="utf-8") as f:
+            f.write(payload)
+        assert state.load_state() == {}
+
+
+@pytest.fixture
+def config(monkeypatch):
+    values = {
+        "status_text": "I need a break",
+        "status_emoji": ":coffee:",
+        "away_message": "I'm going to take a coffee break",
+        "back_message": "I'm back",
+        "channel": "C1",
+    }
+    monkeypatch.setattr(state, "get_config", lambda key, default=None: values.get(key, default))
+    return values
+
+
+def test_snapshot_keeps_only_overrides(config):
+    slack_status = state.NextSlackStatus()
+    slack_status.status_text = "Lunch break"
+    slack_status.back_message = None
+    snapshot = state.build_snapshot(state.Status(im_afk=True), slack_status)
+    assert snapshot["status"]["im_afk"] is True
+    assert snapshot["slack_status"] == {"status_text": "Lunch break", "back_message": None}
+
+
+def test_restore_snapshot_follows_config(config):
+    slack_status = state.NextSlackStatus()
+    slack_status.status_text = "Lunch break"
+    snapshot = state.build_snapshot(state.Status(), slack_status)
+    config["away_message"] = "Edited away message"
+    config["channel"] = ["C1", "C2"]
+    _, restored = state.restore_snapshot(snapshot)
+    assert restored.status_text == "Lunch break"
+    assert restored.away_message == "Edited away message"
+    assert restored.channels == ["C1", "C2"]
+
+
+def test_restore_snapshot_ignores_unknown_values(config):
+    status, slack_status = state.restore_snapshot(
+        {
+            "status": {"im_afk": True, "last_message_ts": "123.4"},
+            "slack_status": {"status_emoji": ":pizza:", "unknown": 1},
+        }
+    )
+    assert status.im_afk is True
+    assert status.last_messages == {}
+    assert slack_status.status_emoji == ":pizza:"
+    assert not hasattr(slack_status, "unknown")
+
+
+def test_checkpoint_round_trip(state_file, config):
+    status = state.Status(going_afk=True, last_messages={"C1": "123.4"}, afk_due_ts=100)
+    state.checkpoint(status, state.NextSlackStatus())
+    restored, _ = state.restore_snapshot(state.load_state())
+    assert restored == status
+
+
+@pytest.mark.parametrize(
+    "due_in,expected",
+    [
+        (10, 10),
+        (0, 0),
+        (-state.RESUME_GRACE_PERIOD, 0),
+        (-state.RESUME_GRACE_PERIOD - 10, None),
+        (None, None),
+    ],
+)
+def test_resume_delay(monkeypatch, due_in, expected):
+    monkeypatch.setattr(state, "get_unix_time", lambda plus_seconds=0: 1000 + plus_seconds)
+    afk_due_ts = None if due_in is None else 1000 + due_in
+    assert state.resume_delay(state.Status(going_afk=True, afk_due_ts=afk_due_ts)) == expected